@@ -1,14 +1,56 @@
+import uuid
 from django.contrib import admin
-from django.utils.html import format_html
-from django.db.models import Count, Q
+from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
+from django.contrib.auth.models import User
+from django.utils.html import escape, format_html
+from django.utils.safestring import mark_safe
+from django.db.models import CharField, Count, DecimalField, Q, Value
+from django.db.models.functions import Cast, Concat, Round, Substr
+from .forms import AdminUserChangeForm
 from .models import UserProfile, Detection, SystemStatistics, Report
 
+# Choice labels resolved once instead of through get_FOO_display() per row
+STATUS_LABELS = dict(Detection.STATUS_CHOICES)
+RESULT_LABELS = dict(Detection.RESULT_CHOICES)
+
+STATUS_COLORS = {
+    'pending': 'gray',
+    'analyzing': 'blue',
+    'completed': 'green',
+    'failed': 'red'
+}
+RESULT_COLORS = {
+    'healthy': 'green',
+    'fmd': 'red',
+    'not_cow': 'orange',
+    'inconclusive': 'gray'
+}
+HEX_DIGITS = set('0123456789abcdef')
+
+# Markup built once; per-row values go through escape() and str.format,
+# which skips format_html's per-call template parsing
+BADGE_TPL = mark_safe('<span style="background-color: {color}; color: white; padding: 3px 10px; border-radius: 3px;">{label}</span>')
+PREVIEW_TPL = mark_safe('<img src="{url}" style="max-width: 300px; max-height: 300px;" />')
+EMPTY_BADGE = mark_safe('<span style="color: gray;">-</span>')
+VERIFIED_BADGE = mark_safe('<span style="color: green;">✓ Verified</span>')
+UNVERIFIED_BADGE = mark_safe('<span style="color: gray;">Not Verified</span>')
+
+
+def _is_changelist(request):
+    """Check whether the admin is rendering a model's changelist page"""
+    match = request.resolver_match
+    return bool(match and match.url_name and match.url_name.endswith('_changelist'))
+
+
 @admin.register(UserProfile)
 class UserProfileAdmin(admin.ModelAdmin):
-    list_display = ['user', 'farm_name', 'location', 'phone_number', 'is_verified', 'created_at']
+    list_display = ['user', 'farm_name', 'location', 'phone_number', 'scan_count', 'is_verified', 'created_at']
     list_filter = ['is_verified', 'location', 'created_at']
     search_fields = ['user__username', 'user__email', 'farm_name', 'phone_number']
     list_editable = ['is_verified']
+    list_select_related = ('user',)
+    list_max_show_all = 200
+    show_full_result_count = False
     readonly_fields = ['created_at', 'updated_at']
     
     fieldsets = (
@@ -26,6 +68,23 @@ class UserProfileAdmin(admin.ModelAdmin):
             'classes': ('collapse',)
         }),
     )
+    
+    def get_queryset(self, request):
+        """Fetch only the listed columns on the changelist"""
+        qs = super().get_queryset(request)
+        if _is_changelist(request):
+            # updated_at stays loaded so list_editable saves still bump it
+            qs = qs.only(
+                'user__username', 'farm_name', 'location', 'phone_number',
+                'is_verified', 'created_at', 'updated_at'
+            ).annotate(scan_count=Count('user__detections'))
+        return qs
+    
+    def scan_count(self, obj):
+        """Display number of detections uploaded by the user"""
+        return obj.scan_count
+    scan_count.short_description = 'Scans'
+    scan_count.admin_order_field = 'scan_count'
 
 
 @admin.register(Detection)
@@ -35,9 +94,14 @@ class DetectionAdmin(admin.ModelAdmin):
         'confidence_display', 'uploaded_at', 'verified_badge'
     ]
     list_filter = ['status', 'result', 'verified_by_admin', 'uploaded_at']
-    search_fields = ['user__username', 'animal_id', 'id']
+    # Prefix matches use the pattern (0013) and trigram (0007) indexes; IDs are handled in get_search_results
+    search_fields = ['^user__username', '^animal_id']
     readonly_fields = ['id', 'uploaded_at', 'analyzed_at', 'image_preview']
     list_per_page = 50
+    list_max_show_all = 200
+    list_select_related = ('user',)
+    # Skip the unfiltered COUNT(*) the changelist runs next to filtered counts
+    show_full_result_count = False
     
     fieldsets = (
         ('Detection Information', {
@@ -55,65 +119,79 @@ class DetectionAdmin(admin.ModelAdmin):
         }),
     )
     
+    def get_queryset(self, request):
+        """Join the owning user so list columns and __str__ don't query per row"""
+        qs = super().get_queryset(request).select_related('user')
+        if _is_changelist(request):
+            # The change form and delete views still need the full row
+            qs = qs.only(
+                'id', 'user__username', 'status', 'result',
+                'confidence_score', 'uploaded_at', 'verified_by_admin'
+            ).annotate(
+                id8=Substr(Cast('id', output_field=CharField()), 1, 8),
+                # PostgreSQL only rounds numerics to a precision, not floats
+                confidence_str=Concat(
+                    Round(Cast('confidence_score', output_field=DecimalField(max_digits=9, decimal_places=4)), 1),
+                    Value('%'),
+                    output_field=CharField()
+                ),
+            )
+        return qs
+    
+    def get_search_results(self, request, queryset, search_term):
+        """Also match detection ID prefixes as an indexed primary-key range"""
+        results, may_have_duplicates = super().get_search_results(request, queryset, search_term)
+        
+        id_prefix = search_term.strip().lower().replace('-', '')
+        if id_prefix and len(id_prefix) <= 32 and set(id_prefix) <= HEX_DIGITS:
+            id_range = (uuid.UUID(id_prefix.ljust(32, '0')), uuid.UUID(id_prefix.ljust(32, 'f')))
+            results |= queryset.filter(pk__range=id_range)
+        
+        return results, may_have_duplicates
+    
     def id_short(self, obj):
-        """Display shortened ID"""
-        return str(obj.id)[:8]
+        """Display shortened ID (sliced by the database in get_queryset)"""
+        return obj.id8
     id_short.short_description = 'ID'
     
     def status_badge(self, obj):
         """Display status with color coding"""
-        colors = {
-            'pending': 'gray',
-            'analyzing': 'blue',
-            'completed': 'green',
-            'failed': 'red'
-        }
-        return format_html(
-            '<span style="background-color: {}; color: white; padding: 3px 10px; border-radius: 3px;">{}</span>',
-            colors.get(obj.status, 'gray'),
-            obj.get_status_display()
-        )
+        return mark_safe(BADGE_TPL.format(
+            color=escape(STATUS_COLORS.get(obj.status, 'gray')),
+            label=escape(STATUS_LABELS.get(obj.status, obj.status))
+        ))
     status_badge.short_description = 'Status'
     
     def result_badge(self, obj):
         """Display result with color coding"""
         if not obj.result:
-            return format_html('<span style="color: gray;">-</span>')
+            return EMPTY_BADGE
         
-        colors = {
-            'healthy': 'green',
-            'fmd': 'red',
-            'not_cow': 'orange',
-            'inconclusive': 'gray'
-        }
-        return format_html(
-            '<span style="background-color: {}; color: white; padding: 3px 10px; border-radius: 3px;">{}</span>',
-            colors.get(obj.result, 'gray'),
-            obj.get_result_display()
-        )
+        return mark_safe(BADGE_TPL.format(
+            color=escape(RESULT_COLORS.get(obj.result, 'gray')),
+            label=escape(RESULT_LABELS.get(obj.result, obj.result))
+        ))
     result_badge.short_description = 'Result'
     
     def confidence_display(self, obj):
-        """Display confidence score as percentage"""
+        """Display confidence score as percentage (formatted by the database)"""
         if obj.confidence_score is None:
             return '-'
-        return f"{obj.confidence_score:.1f}%"
+        return obj.confidence_str
     confidence_display.short_description = 'Confidence'
     
     def verified_badge(self, obj):
         """Display verification status"""
         if obj.verified_by_admin:
-            return format_html('<span style="color: green;">✓ Verified</span>')
-        return format_html('<span style="color: gray;">Not Verified</span>')
+            return VERIFIED_BADGE
+        return UNVERIFIED_BADGE
     verified_badge.short_description = 'Verified'
     
     def image_preview(self, obj):
         """Display image preview in admin"""
-        if obj.image:
-            return format_html(
-                '<img src="{}" style="max-width: 300px; max-height: 300px;" />',
-                obj.image.url
-            )
+        preview = obj.thumbnail or obj.image
+        if preview:
+            return mark_safe(PREVIEW_TPL.format(url=escape(preview.url)))
         return 'No image'
     image_preview.short_description = 'Image Preview'
 
@@ -154,4 +232,13 @@ class ReportAdmin(admin.ModelAdmin):
     stats_summary.short_description = 'Summary'
     
     def has_add_permission(self, request):
-        return False
\ No newline at end of file
+        return False
+
+
+# Stock UserAdmin doesn't check emails, which would hit the UPPER(email) unique index
+admin.site.unregister(User)
+
+
+@admin.register(User)
+class UserAdmin(BaseUserAdmin):
+    form = AdminUserChangeForm
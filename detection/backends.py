@@ -23,25 +23,29 @@ class EmailOrUsernameBackend(ModelBackend):
             return None
         
         try:
-            # Try to find user by username or email (case-insensitive)
+            # Try to find user by username or email (case-insensitive).
+            # Both lookups hit the plain UPPER() indexes from migrations 0004
+            # and 0012; the partial unique email index from 0005 can't serve them.
             user = User.objects.filter(
                 Q(username__iexact=username) | Q(email__iexact=username)
             ).first()
             
             if user is None:
-                logger.info(f"No user found with username/email: {username}")
+                # Run the hasher anyway so a miss takes as long as a bad password
+                User().set_password(password)
+                logger.info("No user found with username/email: %s", username)
                 return None
             
             # Check if password is correct
             if user.check_password(password):
-                logger.info(f"User {user.username} authenticated successfully")
+                logger.info("User %s authenticated successfully", user.username)
                 return user
             else:
-                logger.info(f"Invalid password for user: {user.username}")
+                logger.info("Invalid password for user: %s", user.username)
                 return None
             
         except Exception as e:
-            logger.error(f"Authentication error: {str(e)}")
+            logger.error("Authentication error: %s", e)
             return None
     
     def get_user(self, user_id):
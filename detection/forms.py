@@ -1,7 +1,15 @@
 from django import forms
-from django.contrib.auth.forms import UserCreationForm, AuthenticationForm
+from django.contrib.auth.forms import UserCreationForm, UserChangeForm, AuthenticationForm, PasswordResetForm
 from django.contrib.auth.models import User
+from django.db import transaction
+from django.template import loader
+from PIL import Image
 from .models import UserProfile, Detection
+from .tasks import send_email
+
+ALLOWED_IMAGE_FORMATS = {'JPEG', 'PNG', 'WEBP'}
+# Rejects decompression bombs before the inference pipeline decodes them
+MAX_IMAGE_PIXELS = 50_000_000
 
 class UserRegistrationForm(UserCreationForm):
     """Custom user registration form with additional fields"""
@@ -75,9 +83,9 @@ class UserRegistrationForm(UserCreationForm):
         })
     
     def clean_email(self):
-        """Validate that email is unique"""
+        """Validate that email is unique (case-insensitive)"""
         email = self.cleaned_data.get('email')
-        if User.objects.filter(email=email).exists():
+        if User.objects.filter(email__iexact=email).exists():
             raise forms.ValidationError('This email is already registered.')
         return email
     
@@ -89,18 +97,31 @@ class UserRegistrationForm(UserCreationForm):
         user.last_name = self.cleaned_data['last_name']
         
         if commit:
-            user.save()
-            # Create user profile
-            UserProfile.objects.create(
-                user=user,
-                phone_number=self.cleaned_data.get('phone_number', ''),
-                farm_name=self.cleaned_data.get('farm_name', 'Simba Farms'),
-                location=self.cleaned_data.get('location', 'Ibanda District')
-            )
+            # Commit user and profile together so a failure can't orphan the user
+            with transaction.atomic():
+                user.save()
+                # Create user profile
+                UserProfile.objects.create(
+                    user=user,
+                    phone_number=self.cleaned_data.get('phone_number', ''),
+                    farm_name=self.cleaned_data.get('farm_name', 'Simba Farms'),
+                    location=self.cleaned_data.get('location', 'Ibanda District')
+                )
         
         return user
 
 
+class AdminUserChangeForm(UserChangeForm):
+    """Admin user form that enforces the case-insensitive email uniqueness"""
+    
+    def clean_email(self):
+        """Reject an email another account already uses in any letter case"""
+        email = self.cleaned_data.get('email')
+        if email and User.objects.filter(email__iexact=email).exclude(pk=self.instance.pk).exists():
+            raise forms.ValidationError('This email is already registered.')
+        return email
+
+
 class UserLoginForm(AuthenticationForm):
     """Custom login form with styled fields"""
     username = forms.CharField(
@@ -121,6 +142,20 @@ class UserLoginForm(AuthenticationForm):
     )
 
 
+class QueuedPasswordResetForm(PasswordResetForm):
+    """Password reset form that hands the email to a worker instead of sending inline"""
+    
+    def send_mail(self, subject_template_name, email_template_name, context,
+                  from_email, to_email, html_email_template_name=None):
+        subject = ''.join(loader.render_to_string(subject_template_name, context).splitlines())
+        body = loader.render_to_string(email_template_name, context)
+        html_body = None
+        if html_email_template_name is not None:
+            html_body = loader.render_to_string(html_email_template_name, context)
+        
+        send_email.delay(subject, body, from_email, [to_email], html_body)
+
+
 class DetectionUploadForm(forms.ModelForm):
     """Form for uploading cattle images"""
     
@@ -156,10 +191,24 @@ class DetectionUploadForm(forms.ModelForm):
             if image.size > 10 * 1024 * 1024:
                 raise forms.ValidationError('Image file size cannot exceed 10MB.')
             
-            # Check file type
-            valid_types = ['image/jpeg', 'image/png', 'image/jpg', 'image/webp']
-            if hasattr(image, 'content_type'):
-                if image.content_type not in valid_types:
-                    raise forms.ValidationError('Only JPG, PNG, and WEBP images are allowed.')
+            # Check real type and dimensions from the image header rather than
+            # the client-supplied content type. forms.ImageField has already
+            # parsed the header with Pillow for fresh uploads.
+            header = getattr(image, 'image', None)
+            if header is None:
+                try:
+                    image.seek(0)
+                    header = Image.open(image)
+                except (OSError, Image.DecompressionBombError):
+                    raise forms.ValidationError('Upload a valid image file.')
+                finally:
+                    image.seek(0)
+            
+            if header.format not in ALLOWED_IMAGE_FORMATS:
+                raise forms.ValidationError('Only JPG, PNG, and WEBP images are allowed.')
+            
+            width, height = header.size
+            if width * height > MAX_IMAGE_PIXELS:
+                raise forms.ValidationError('Image resolution cannot exceed 50 megapixels.')
         
         return image
\ No newline at end of file
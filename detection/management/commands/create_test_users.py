@@ -0,0 +1,89 @@
+"""
+Management command to populate initial test data
+"""
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from detection.models import UserProfile, SystemStatistics
+
+# Farm details every seeded profile starts with
+PROFILE_DEFAULTS = {
+    'phone_number': '+256700000000',
+    'farm_name': 'Simba Farms',
+    'location': 'Ibanda District',
+    'is_verified': True,
+}
+
+
+class Command(BaseCommand):
+    help = 'Populate database with initial test data'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=1, help='Number of test users to create')
+        parser.add_argument('--password', default='testpass123', help='Password for the created users')
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.SUCCESS('Starting data population...'))
+
+        count = options['count']
+        # Hash once; every seeded account shares the same password
+        password = make_password(options['password'])
+
+        with transaction.atomic():
+            if count == 1:
+                created = self.create_single_user(password)
+            else:
+                created = self.create_bulk_users(count, password)
+
+            # Create initial statistics entry
+            SystemStatistics.upsert_for(timezone.now().date())
+
+        self.stdout.write(self.style.SUCCESS(f'Created {created} test user(s)'))
+        self.stdout.write(self.style.SUCCESS('Data population completed!'))
+        self.stdout.write(self.style.WARNING('Test user credentials:'))
+        self.stdout.write(self.style.WARNING('Username: testuser' if count == 1 else f'Usernames: testuser1 to testuser{count}'))
+        self.stdout.write(self.style.WARNING(f"Password: {options['password']}"))
+
+    def create_single_user(self, password):
+        """Create the default test user unless it already exists"""
+        user, created = User.objects.get_or_create(
+            username='testuser',
+            defaults={
+                'email': 'test@simbafarns.com',
+                'first_name': 'Test',
+                'last_name': 'User',
+                'password': password,
+            }
+        )
+
+        if created:
+            UserProfile.objects.create(user=user, **PROFILE_DEFAULTS)
+
+        return int(created)
+
+    def create_bulk_users(self, count, password):
+        """Insert numbered test users and their profiles in two bulk queries"""
+        usernames = [f'testuser{i}' for i in range(1, count + 1)]
+
+        User.objects.bulk_create(
+            [
+                User(
+                    username=username,
+                    email=f'{username}@simbafarns.com',
+                    first_name='Test',
+                    last_name='User',
+                    password=password,
+                )
+                for username in usernames
+            ],
+            ignore_conflicts=True,
+        )
+
+        # ignore_conflicts leaves primary keys unset, so re-read the new users
+        users = User.objects.filter(username__in=usernames, profile__isnull=True)
+        profiles = UserProfile.objects.bulk_create([UserProfile(user=user, **PROFILE_DEFAULTS) for user in users])
+
+        return len(profiles)
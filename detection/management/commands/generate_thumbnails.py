@@ -0,0 +1,24 @@
+"""
+Management command to backfill thumbnails for existing detections
+"""
+from django.core.management.base import BaseCommand
+
+from detection.models import Detection
+
+
+class Command(BaseCommand):
+    help = 'Generate preview thumbnails for detections that do not have one'
+
+    def handle(self, *args, **options):
+        detections = Detection.objects.filter(thumbnail='').exclude(image='')
+        generated = 0
+
+        for detection in detections.iterator():
+            detection.generate_thumbnail()
+            detection.image.close()
+
+            if detection.thumbnail:
+                detection.save(update_fields=['thumbnail'])
+                generated += 1
+
+        self.stdout.write(self.style.SUCCESS(f'Generated {generated} thumbnail(s)'))
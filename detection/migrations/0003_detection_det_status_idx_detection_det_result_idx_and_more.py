@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-15 22:07
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('detection', '0002_report'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='detection',
+            index=models.Index(fields=['status'], name='det_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='detection',
+            index=models.Index(fields=['result'], name='det_result_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='detection',
+            index=models.Index(fields=['verified_by_admin'], name='det_verified_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='detection',
+            index=models.Index(fields=['-uploaded_at', 'status'], name='det_uploaded_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='detection',
+            index=models.Index(fields=['user', '-uploaded_at'], name='det_user_uploaded_idx'),
+        ),
+    ]
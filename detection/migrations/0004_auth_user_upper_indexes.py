@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """
+    Expression indexes backing the case-insensitive username/email lookup
+    in EmailOrUsernameBackend. PostgreSQL compiles ``__iexact`` to
+    ``UPPER(column) = UPPER(%s)``, so the indexes are built on UPPER().
+    """
+
+    dependencies = [
+        ('detection', '0003_detection_det_status_idx_detection_det_result_idx_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql='CREATE INDEX IF NOT EXISTS auth_user_username_upper ON auth_user (UPPER(username));',
+            reverse_sql='DROP INDEX IF EXISTS auth_user_username_upper;',
+        ),
+        migrations.RunSQL(
+            sql='CREATE INDEX IF NOT EXISTS auth_user_email_upper ON auth_user (UPPER(email));',
+            reverse_sql='DROP INDEX IF EXISTS auth_user_email_upper;',
+        ),
+    ]
@@ -0,0 +1,56 @@
+from django.conf import settings
+from django.db import migrations
+from django.db.models import Count
+from django.db.models.functions import Upper
+
+
+def check_duplicate_emails(apps, schema_editor):
+    """Name the accounts that would break the unique index before building it"""
+    User = apps.get_model('auth', 'User')
+    duplicates = (
+        User.objects.exclude(email='')
+        .values(email_upper=Upper('email'))
+        .annotate(accounts=Count('id'))
+        .filter(accounts__gt=1)
+        .values_list('email_upper', flat=True)
+    )
+    clashes = {}
+    for email, username in User.objects.annotate(email_upper=Upper('email')).filter(
+        email_upper__in=list(duplicates)
+    ).values_list('email_upper', 'username'):
+        clashes.setdefault(email, []).append(username)
+    
+    if clashes:
+        details = '; '.join(f"{email}: {', '.join(sorted(names))}" for email, names in sorted(clashes.items()))
+        raise RuntimeError(
+            'Cannot make emails case-insensitively unique; change the email of all but one '
+            f'account in each group and re-run migrate. {details}'
+        )
+
+
+class Migration(migrations.Migration):
+    """
+    Make the UPPER(email) index unique so registration can't create accounts
+    whose emails differ only by case. Blank emails (e.g. superusers created
+    without one) are excluded. The unique index also serves the backend's
+    email lookup, so it replaces the plain index from 0004. Existing emails
+    that differ only by case are reported up front instead of failing the
+    index build.
+    """
+
+    dependencies = [
+        ('detection', '0004_auth_user_upper_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(check_duplicate_emails, migrations.RunPython.noop),
+        migrations.RunSQL(
+            sql='DROP INDEX IF EXISTS auth_user_email_upper;',
+            reverse_sql='CREATE INDEX IF NOT EXISTS auth_user_email_upper ON auth_user (UPPER(email));',
+        ),
+        migrations.RunSQL(
+            sql="CREATE UNIQUE INDEX IF NOT EXISTS auth_user_email_upper_uniq ON auth_user (UPPER(email)) WHERE email <> '';",
+            reverse_sql='DROP INDEX IF EXISTS auth_user_email_upper_uniq;',
+        ),
+    ]
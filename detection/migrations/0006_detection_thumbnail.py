@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-15 22:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('detection', '0005_auth_user_email_upper_unique'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='detection',
+            name='thumbnail',
+            field=models.ImageField(blank=True, upload_to='cattle_thumbs/%Y/%m/%d/'),
+        ),
+    ]
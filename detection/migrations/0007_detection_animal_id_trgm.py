@@ -0,0 +1,30 @@
+from django.db import migrations
+
+
+def create_trigram_index(apps, schema_editor):
+    """Trigram index for admin animal_id searches (PostgreSQL only)"""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm;')
+    # Admin's ^animal_id search compiles to UPPER(animal_id) LIKE UPPER('term%')
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS det_animal_id_trgm_idx '
+        'ON detection_detection USING gin (UPPER(animal_id) gin_trgm_ops);'
+    )
+
+
+def drop_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS det_animal_id_trgm_idx;')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('detection', '0006_detection_thumbnail'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_index, drop_trigram_index),
+    ]
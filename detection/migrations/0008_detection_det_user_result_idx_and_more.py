@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-15 22:18
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('detection', '0007_detection_animal_id_trgm'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='detection',
+            index=models.Index(fields=['user', 'result'], name='det_user_result_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='detection',
+            index=models.Index(fields=['user', 'status', 'confidence_score'], name='det_user_stat_conf_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-15 22:20
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('detection', '0008_detection_det_user_result_idx_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='detection',
+            index=models.Index(condition=models.Q(('confidence_score__isnull', False), ('status', 'completed')), fields=['user', 'confidence_score'], name='det_user_conf_completed_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-15 22:23
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('detection', '0009_detection_det_user_conf_completed_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='report',
+            index=models.Index(fields=['user', '-generated_at'], name='report_user_generated_idx'),
+        ),
+    ]
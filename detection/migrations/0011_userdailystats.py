@@ -0,0 +1,59 @@
+# Generated by Django 5.2.18 on 2026-10-15 22:26
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+
+
+def backfill_user_daily_stats(apps, schema_editor):
+    """Seed the per-user daily counters from existing detections"""
+    Detection = apps.get_model('detection', 'Detection')
+    UserDailyStats = apps.get_model('detection', 'UserDailyStats')
+    
+    rows = (
+        Detection.objects
+        .annotate(day=TruncDate('uploaded_at'))
+        .values('user_id', 'day')
+        .annotate(total=Count('id'))
+        .order_by()
+    )
+    UserDailyStats.objects.bulk_create(
+        [
+            UserDailyStats(
+                user_id=row['user_id'],
+                date=row['day'],
+                total_scans=row['total'],
+            )
+            for row in rows.iterator()
+        ],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('detection', '0010_report_report_user_generated_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('total_scans', models.IntegerField(default=0)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'User Daily Statistics',
+                'verbose_name_plural': 'User Daily Statistics',
+                'ordering': ['-date'],
+                'constraints': [models.UniqueConstraint(fields=('user', 'date'), name='user_daily_stats_user_date_uniq')],
+            },
+        ),
+        migrations.RunPython(backfill_user_daily_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+from django.conf import settings
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """
+    Bring back the plain UPPER(email) index that 0005 dropped. PostgreSQL
+    only uses a partial index when the query implies its predicate, and
+    ``UPPER(email) = UPPER(%s)`` does not imply ``email <> ''``, so the
+    partial unique index enforces uniqueness but cannot serve the lookups.
+    """
+
+    dependencies = [
+        ('detection', '0011_userdailystats'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql='CREATE INDEX IF NOT EXISTS auth_user_email_upper ON auth_user (UPPER(email));',
+            reverse_sql='DROP INDEX IF EXISTS auth_user_email_upper;',
+        ),
+    ]
@@ -0,0 +1,30 @@
+from django.db import migrations
+
+
+def create_pattern_index(apps, schema_editor):
+    """Pattern index for admin username prefix searches (PostgreSQL only)"""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    # Admin's ^user__username search compiles to UPPER(username) LIKE UPPER('term%'),
+    # which the plain UPPER(username) btree from 0004 can't serve under a non-C collation
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS auth_user_username_upper_pattern '
+        'ON auth_user (UPPER(username) text_pattern_ops);'
+    )
+
+
+def drop_pattern_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS auth_user_username_upper_pattern;')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('detection', '0012_auth_user_email_upper_restore'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_pattern_index, drop_pattern_index),
+    ]
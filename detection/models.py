@@ -1,8 +1,15 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
 from django.utils import timezone
+from io import BytesIO
+from PIL import Image
+import logging
+import os
 import uuid
 
+logger = logging.getLogger(__name__)
+
 class UserProfile(models.Model):
     """Extended user profile for additional information"""
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='profile')
@@ -41,6 +48,7 @@ class Detection(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='detections')
     image = models.ImageField(upload_to='cattle_images/%Y/%m/%d/')
+    thumbnail = models.ImageField(upload_to='cattle_thumbs/%Y/%m/%d/', blank=True)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
     result = models.CharField(max_length=20, choices=RESULT_CHOICES, null=True, blank=True)
     confidence_score = models.FloatField(null=True, blank=True)
@@ -62,10 +70,43 @@ class Detection(models.Model):
         ordering = ['-uploaded_at']
         verbose_name = 'Detection Record'
         verbose_name_plural = 'Detection Records'
+        indexes = [
+            models.Index(fields=['status'], name='det_status_idx'),
+            models.Index(fields=['result'], name='det_result_idx'),
+            models.Index(fields=['verified_by_admin'], name='det_verified_idx'),
+            models.Index(fields=['-uploaded_at', 'status'], name='det_uploaded_status_idx'),
+            models.Index(fields=['user', '-uploaded_at'], name='det_user_uploaded_idx'),
+            models.Index(fields=['user', 'result'], name='det_user_result_idx'),
+            models.Index(fields=['user', 'status', 'confidence_score'], name='det_user_stat_conf_idx'),
+            # Covers the report's average-confidence aggregate
+            models.Index(
+                fields=['user', 'confidence_score'],
+                name='det_user_conf_completed_idx',
+                condition=models.Q(status='completed', confidence_score__isnull=False),
+            ),
+        ]
     
     def __str__(self):
         return f"Detection {self.id} - {self.user.username} - {self.result or 'Pending'}"
     
+    def generate_thumbnail(self, size=(300, 300)):
+        """Store a small JPEG preview of the image for list pages and admin"""
+        try:
+            self.image.seek(0)
+            with Image.open(self.image) as img:
+                img.thumbnail(size, Image.Resampling.LANCZOS)
+                buffer = BytesIO()
+                img.convert('RGB').save(buffer, 'JPEG', quality=80)
+            
+            name = os.path.splitext(os.path.basename(self.image.name))[0]
+            self.thumbnail.save(f'{name}.jpg', ContentFile(buffer.getvalue()), save=False)
+        except (OSError, Image.DecompressionBombError) as e:
+            # Also covers a missing media file, which must not be reopened to rewind
+            logger.warning("Could not create thumbnail for %s: %s", self.image.name, e)
+            return
+        
+        self.image.seek(0)
+    
     @property
     def is_positive(self):
         """Check if FMD was detected"""
@@ -92,6 +133,75 @@ class SystemStatistics(models.Model):
     
     def __str__(self):
         return f"Stats for {self.date}"
+    
+    @classmethod
+    def upsert_for(cls, date, **counts):
+        """
+        Create the row for a date, or overwrite the given counters if it
+        exists, in one INSERT ... ON CONFLICT statement. Without counters
+        an existing row is left untouched.
+        """
+        row = cls(date=date, **counts)
+        if counts:
+            cls.objects.bulk_create(
+                [row],
+                update_conflicts=True,
+                unique_fields=['date'],
+                update_fields=list(counts)
+            )
+        else:
+            cls.objects.bulk_create([row], ignore_conflicts=True)
+    
+    @classmethod
+    def increment(cls, date, **deltas):
+        """
+        Add to the counters for a date with a single UPDATE using F()
+        expressions, creating the row first on the day's first scan
+        """
+        updates = {field: models.F(field) + delta for field, delta in deltas.items()}
+        with transaction.atomic():
+            if not cls.objects.filter(date=date).update(**updates):
+                cls.upsert_for(date)
+                cls.objects.filter(date=date).update(**updates)
+
+
+
+class UserDailyStats(models.Model):
+    """Per-user daily upload counts, summed by the dashboard instead of counting detections"""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='daily_stats')
+    date = models.DateField()
+    total_scans = models.IntegerField(default=0)
+    
+    class Meta:
+        ordering = ['-date']
+        verbose_name = 'User Daily Statistics'
+        verbose_name_plural = 'User Daily Statistics'
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'date'], name='user_daily_stats_user_date_uniq'),
+        ]
+    
+    def __str__(self):
+        return f"Stats for {self.user_id} on {self.date}"
+    
+    @classmethod
+    def increment(cls, user_id, date, **deltas):
+        """
+        Add to a user's counters for a date with a single UPDATE using F()
+        expressions, creating the row first on the user's first scan that day
+        """
+        updates = {field: models.F(field) + delta for field, delta in deltas.items()}
+        rows = cls.objects.filter(user_id=user_id, date=date)
+        with transaction.atomic():
+            if not rows.update(**updates):
+                cls.objects.bulk_create([cls(user_id=user_id, date=date)], ignore_conflicts=True)
+                rows.update(**updates)
+    
+    @classmethod
+    def decrement(cls, user_id, date):
+        """Take a deleted scan back off a user's count for the day it was uploaded"""
+        cls.objects.filter(user_id=user_id, date=date, total_scans__gt=0).update(
+            total_scans=models.F('total_scans') - 1
+        )
 
 
 class Report(models.Model):
@@ -118,6 +228,9 @@ class Report(models.Model):
         ordering = ['-generated_at']
         verbose_name = 'Report'
         verbose_name_plural = 'Reports'
+        indexes = [
+            models.Index(fields=['user', '-generated_at'], name='report_user_generated_idx'),
+        ]
     
     def __str__(self):
         return f"{self.get_report_type_display()} Report - {self.generated_at.strftime('%Y-%m-%d')}"
\ No newline at end of file
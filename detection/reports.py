@@ -1,8 +1,9 @@
 """
 Report generation service for FMD Detection System
 """
+from django.db import transaction
 from django.utils import timezone
-from django.db.models import Count, Q
+from django.db.models import Avg, Count, Q
 from datetime import timedelta, datetime
 from reportlab.lib.pagesizes import letter, A4
 from reportlab.lib import colors
@@ -14,10 +15,95 @@ from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
 from io import BytesIO
 import logging
 
-from .models import Detection, UserProfile
+from .models import Detection, Report, UserProfile
 
 logger = logging.getLogger(__name__)
 
+# Choice labels resolved once instead of per-row get_FOO_display() calls
+RESULT_DISPLAY = dict(Detection.RESULT_CHOICES)
+STATUS_DISPLAY = dict(Detection.STATUS_CHOICES)
+
+# Report colours, parsed once
+PRIMARY_BLUE = colors.HexColor('#2196F3')
+HEADING_BLUE = colors.HexColor('#1565C0')
+TABLE_GREEN = colors.HexColor('#4CAF50')
+
+SUMMARY_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), PRIMARY_BLUE),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 12),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black),
+    ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 1), (-1, -1), 10),
+    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey]),
+])
+
+DETECTION_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), TABLE_GREEN),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 10),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+    ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 1), (-1, -1), 9),
+    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey]),
+])
+
+
+def _build_styles():
+    """Build the report stylesheet with the custom paragraph styles"""
+    styles = getSampleStyleSheet()
+    styles.add(ParagraphStyle(
+        name='CustomTitle',
+        parent=styles['Heading1'],
+        fontSize=24,
+        textColor=PRIMARY_BLUE,
+        spaceAfter=30,
+        alignment=TA_CENTER,
+        fontName='Helvetica-Bold'
+    ))
+    
+    styles.add(ParagraphStyle(
+        name='CustomHeading',
+        parent=styles['Heading2'],
+        fontSize=16,
+        textColor=HEADING_BLUE,
+        spaceAfter=12,
+        fontName='Helvetica-Bold'
+    ))
+    
+    styles.add(ParagraphStyle(
+        name='CustomBody',
+        parent=styles['Normal'],
+        fontSize=11,
+        spaceAfter=12,
+    ))
+    return styles
+
+
+# Styles are read-only once built, so every generator shares one stylesheet
+_STYLES = _build_styles()
+
+
+def persist_report(user, report_type, start_date, end_date, data):
+    """Record a generated report in its own explicit transaction"""
+    with transaction.atomic():
+        return Report.objects.create(
+            user=user,
+            report_type=report_type,
+            start_date=start_date,
+            end_date=end_date,
+            total_scans=data['total_scans'],
+            fmd_detected=data['fmd_detected'],
+            healthy_cattle=data['healthy_cattle']
+        )
+
 
 class ReportGenerator:
     """Generate PDF reports for FMD detections"""
@@ -25,40 +111,16 @@ class ReportGenerator:
     def __init__(self, user, report_type='daily'):
         self.user = user
         self.report_type = report_type
-        self.buffer = BytesIO()
-        self.styles = getSampleStyleSheet()
-        self.setup_custom_styles()
-        
-    def setup_custom_styles(self):
-        """Setup custom paragraph styles"""
-        self.styles.add(ParagraphStyle(
-            name='CustomTitle',
-            parent=self.styles['Heading1'],
-            fontSize=24,
-            textColor=colors.HexColor('#2196F3'),
-            spaceAfter=30,
-            alignment=TA_CENTER,
-            fontName='Helvetica-Bold'
-        ))
-        
-        self.styles.add(ParagraphStyle(
-            name='CustomHeading',
-            parent=self.styles['Heading2'],
-            fontSize=16,
-            textColor=colors.HexColor('#1565C0'),
-            spaceAfter=12,
-            fontName='Helvetica-Bold'
-        ))
-        
-        self.styles.add(ParagraphStyle(
-            name='CustomBody',
-            parent=self.styles['Normal'],
-            fontSize=11,
-            spaceAfter=12,
-        ))
-    
+        self.styles = _STYLES
+        # Memoised so the PDF, the Report record and the email share one query
+        self._date_range = None
+        self._report_data = {}
+        
     def get_date_range(self):
         """Get date range based on report type"""
+        if self._date_range is not None:
+            return self._date_range
+        
         now = timezone.now()
         
         if self.report_type == 'daily':
@@ -78,30 +140,42 @@ class ReportGenerator:
             end_date = now
             title = "Report"
         
-        return start_date, end_date, title
+        self._date_range = (start_date, end_date, title)
+        return self._date_range
     
     def get_report_data(self, start_date, end_date):
         """Fetch detection data for the date range"""
+        if (start_date, end_date) in self._report_data:
+            return self._report_data[start_date, end_date]
+        
         detections = Detection.objects.filter(
             user=self.user,
             uploaded_at__range=[start_date, end_date]
-        ).order_by('-uploaded_at')
-        
-        # Calculate statistics
-        total_scans = detections.count()
-        fmd_detected = detections.filter(result='fmd').count()
-        healthy_cattle = detections.filter(result='healthy').count()
-        not_cow = detections.filter(result='not_cow').count()
-        inconclusive = detections.filter(result='inconclusive').count()
-        
-        # Calculate average confidence
-        completed = detections.filter(status='completed', confidence_score__isnull=False)
-        avg_confidence = 0
-        if completed.exists():
-            avg_confidence = sum(d.confidence_score for d in completed) / completed.count()
-        
-        return {
-            'detections': detections,
+        )
+        
+        # Detail rows stay lazy; generate() streams them from the cursor
+        detection_rows = detections.order_by('-uploaded_at').values_list(
+            'uploaded_at', 'animal_id', 'result', 'confidence_score', 'status'
+        )
+        
+        # Calculate statistics in a single query
+        stats = detections.aggregate(
+            total_scans=Count('id'),
+            fmd_detected=Count('id', filter=Q(result='fmd')),
+            healthy_cattle=Count('id', filter=Q(result='healthy')),
+            not_cow=Count('id', filter=Q(result='not_cow')),
+            inconclusive=Count('id', filter=Q(result='inconclusive')),
+            avg_confidence=Avg('confidence_score', filter=Q(status='completed', confidence_score__isnull=False)),
+        )
+        total_scans = stats['total_scans']
+        fmd_detected = stats['fmd_detected']
+        healthy_cattle = stats['healthy_cattle']
+        not_cow = stats['not_cow']
+        inconclusive = stats['inconclusive']
+        avg_confidence = stats['avg_confidence'] or 0
+        
+        data = self._report_data[start_date, end_date] = {
+            'detection_rows': detection_rows,
             'total_scans': total_scans,
             'fmd_detected': fmd_detected,
             'healthy_cattle': healthy_cattle,
@@ -111,11 +185,31 @@ class ReportGenerator:
             'fmd_percentage': (fmd_detected / total_scans * 100) if total_scans > 0 else 0,
             'healthy_percentage': (healthy_cattle / total_scans * 100) if total_scans > 0 else 0,
         }
+        return data
+    
+    def render(self, output=None):
+        """Generate the PDF and return it with the period and figures it covers"""
+        if output is None:
+            output = BytesIO()
+        
+        # The PDF is laid out from exactly the values handed back to the caller
+        start_date, end_date, title = self.get_date_range()
+        data = self.get_report_data(start_date, end_date)
+        self._build(output, title, data)
+        
+        # Hand back the buffer itself rather than a copy of its contents
+        if hasattr(output, 'seek'):
+            output.seek(0)
+        return output, start_date, end_date, title, data
     
-    def generate(self):
-        """Generate the complete PDF report"""
+    def generate(self, output=None):
+        """Generate the complete PDF report into output (a new BytesIO by default)"""
+        return self.render(output)[0]
+    
+    def _build(self, output, title, data):
+        """Lay out the report for title and data and write the PDF into output"""
         doc = SimpleDocTemplate(
-            self.buffer,
+            output,
             pagesize=A4,
             rightMargin=72,
             leftMargin=72,
@@ -126,10 +220,6 @@ class ReportGenerator:
         # Container for the 'Flowable' objects
         elements = []
         
-        # Get date range and data
-        start_date, end_date, title = self.get_date_range()
-        data = self.get_report_data(start_date, end_date)
-        
         # Header
         elements.append(Paragraph("FMD Early Detection System", self.styles['CustomTitle']))
         elements.append(Paragraph("Simba Farms, Ibanda District", self.styles['CustomBody']))
@@ -158,39 +248,32 @@ class ReportGenerator:
         # Summary Statistics
         elements.append(Paragraph("Summary Statistics", self.styles['CustomHeading']))
         
+        total = data['total_scans']
+        fmd = data['fmd_detected']
+        not_cow = data['not_cow']
+        inconclusive = data['inconclusive']
+        
         summary_data = [
             ['Metric', 'Count', 'Percentage'],
-            ['Total Scans', str(data['total_scans']), '100%'],
-            ['FMD Detected', str(data['fmd_detected']), f"{data['fmd_percentage']:.1f}%"],
+            ['Total Scans', str(total), '100%'],
+            ['FMD Detected', str(fmd), f"{data['fmd_percentage']:.1f}%"],
             ['Healthy Cattle', str(data['healthy_cattle']), f"{data['healthy_percentage']:.1f}%"],
-            ['Not a Cow', str(data['not_cow']), f"{(data['not_cow']/data['total_scans']*100) if data['total_scans'] > 0 else 0:.1f}%"],
-            ['Inconclusive', str(data['inconclusive']), f"{(data['inconclusive']/data['total_scans']*100) if data['total_scans'] > 0 else 0:.1f}%"],
+            ['Not a Cow', str(not_cow), f"{(not_cow/total*100) if total > 0 else 0:.1f}%"],
+            ['Inconclusive', str(inconclusive), f"{(inconclusive/total*100) if total > 0 else 0:.1f}%"],
             ['Average Confidence', f"{data['avg_confidence']:.2f}%", '-'],
         ]
         
         summary_table = Table(summary_data, colWidths=[3*inch, 1.5*inch, 1.5*inch])
-        summary_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2196F3')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 12),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 1), (-1, -1), 10),
-            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey]),
-        ]))
+        summary_table.setStyle(SUMMARY_TABLE_STYLE)
         
         elements.append(summary_table)
         elements.append(Spacer(1, 20))
         
         # Alerts Section
-        if data['fmd_detected'] > 0:
+        if fmd > 0:
             elements.append(Paragraph("⚠️ CRITICAL ALERTS", self.styles['CustomHeading']))
             alert_text = f"""
-            <font color="red"><b>{data['fmd_detected']} case(s) of FMD detected during this period!</b></font><br/>
+            <font color="red"><b>{fmd} case(s) of FMD detected during this period!</b></font><br/>
             <b>Immediate Action Required:</b><br/>
             • Isolate affected animals immediately<br/>
             • Contact veterinary officer<br/>
@@ -201,33 +284,23 @@ class ReportGenerator:
             elements.append(Spacer(1, 20))
         
         # Detailed Detection Records
-        if data['detections'].exists():
+        if data['total_scans']:
             elements.append(Paragraph("Detailed Detection Records", self.styles['CustomHeading']))
             
-            detection_data = [['Date', 'Animal ID', 'Result', 'Confidence', 'Status']]
-            
-            for detection in data['detections']:
-                detection_data.append([
-                    detection.uploaded_at.strftime('%Y-%m-%d %H:%M'),
-                    detection.animal_id or 'N/A',
-                    detection.get_result_display() if detection.result else 'Pending',
-                    f"{detection.confidence_score:.1f}%" if detection.confidence_score else 'N/A',
-                    detection.get_status_display(),
-                ])
+            result_label = RESULT_DISPLAY.get
+            detection_data = [['Date', 'Animal ID', 'Result', 'Confidence', 'Status']] + [
+                [
+                    uploaded.strftime('%Y-%m-%d %H:%M'),
+                    animal_id or 'N/A',
+                    result_label(result, 'Pending'),
+                    '%.1f%%' % confidence if confidence else 'N/A',
+                    STATUS_DISPLAY[status],
+                ]
+                for uploaded, animal_id, result, confidence, status in data['detection_rows'].iterator(chunk_size=500)
+            ]
             
             detection_table = Table(detection_data, colWidths=[1.8*inch, 1.2*inch, 1.2*inch, 1.2*inch, 1*inch])
-            detection_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#4CAF50')),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 10),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-                ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-                ('FONTSIZE', (0, 1), (-1, -1), 9),
-                ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey]),
-            ]))
+            detection_table.setStyle(DETECTION_TABLE_STYLE)
             
             elements.append(detection_table)
         else:
@@ -251,29 +324,27 @@ class ReportGenerator:
         
         # Build PDF
         doc.build(elements)
-        
-        # Get the value of the BytesIO buffer and return it
-        pdf = self.buffer.getvalue()
-        self.buffer.close()
-        return pdf
     
     def _generate_recommendations(self, data):
         """Generate recommendations based on detection data"""
         recommendations = []
+        fmd, total, conf, healthy = (
+            data['fmd_detected'], data['total_scans'], data['avg_confidence'], data['healthy_cattle']
+        )
         
-        if data['fmd_detected'] > 0:
+        if fmd > 0:
             recommendations.append("• <b>URGENT:</b> FMD cases detected. Implement immediate quarantine and contact veterinary services.")
         
         if data['fmd_percentage'] > 10:
             recommendations.append("• High FMD detection rate. Consider mass screening of the entire herd.")
         
-        if data['total_scans'] < 5 and self.report_type == 'daily':
+        if total < 5 and self.report_type == 'daily':
             recommendations.append("• Consider increasing monitoring frequency for early detection.")
         
-        if data['avg_confidence'] < 70 and data['avg_confidence'] > 0:
+        if 0 < conf < 70:
             recommendations.append("• Average confidence is below 70%. Ensure images are clear and well-lit for better accuracy.")
         
-        if data['healthy_cattle'] == data['total_scans']:
+        if healthy == total:
             recommendations.append("• ✓ All scanned cattle appear healthy. Continue regular monitoring and good farm hygiene practices.")
         
         if not recommendations:
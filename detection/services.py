@@ -2,9 +2,13 @@
 Service module for FMD detection using Roboflow API
 """
 from inference_sdk import InferenceHTTPClient
+from inference_sdk.http.utils import executors as sdk_executors
 from django.conf import settings
+from requests.adapters import HTTPAdapter
+import requests
 import os
 import logging
+import threading
 
 logger = logging.getLogger(__name__)
 
@@ -19,6 +23,60 @@ CLIENT = InferenceHTTPClient(
 )
 
 
+def _build_http_session():
+    """Create a keep-alive session so inference calls reuse TLS connections"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=10, pool_maxsize=10, max_retries=3)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers['Connection'] = 'keep-alive'
+    return session
+
+
+# requests.Session isn't thread-safe and the SDK sends batches from a thread
+# pool, so each thread keeps its own session (as newer SDK releases do)
+_THREAD_SESSIONS = threading.local()
+
+
+def _get_http_session():
+    """Return the calling thread's keep-alive session, creating it on first use"""
+    session = getattr(_THREAD_SESSIONS, 'session', None)
+    if session is None:
+        session = _THREAD_SESSIONS.session = _build_http_session()
+    return session
+
+
+class _PooledRequests:
+    """Stand-in for the requests module that sends get/post through a per-thread session"""
+    
+    def get(self, *args, **kwargs):
+        return _get_http_session().get(*args, **kwargs)
+    
+    def post(self, *args, **kwargs):
+        return _get_http_session().post(*args, **kwargs)
+    
+    def __getattr__(self, name):
+        return getattr(requests, name)
+
+
+# Class-name keywords mapped to result categories, checked in priority order
+_CATEGORY_KEYWORDS = (
+    ('fmd', 'fmd'),
+    ('foot-and-mouth', 'fmd'),
+    ('disease', 'fmd'),
+    ('healthy', 'healthy'),
+    ('normal', 'healthy'),
+    # Labelled as cattle without a health status
+    ('cow', 'inconclusive'),
+    ('cattle', 'inconclusive'),
+)
+
+# inference-sdk 0.63 calls requests.get/post per image, opening a fresh
+# connection each time; newer releases keep their own pooled session
+if not hasattr(sdk_executors, '_get_thread_local_requests_session'):
+    sdk_executors.requests = _PooledRequests()
+
+
 def analyze_cattle_image(image_path):
     """
     Analyze cattle image using Roboflow model
@@ -33,8 +91,9 @@ def analyze_cattle_image(image_path):
         # Call Roboflow API
         result = CLIENT.infer(image_path, model_id=MODEL_ID)
         
-        # Log the raw result for debugging
-        logger.info(f"Roboflow API Response: {result}")
+        # Log the raw result for debugging; skip the repr when INFO is off
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Roboflow API Response: %s", result)
         
         # Parse the result
         analysis = parse_roboflow_result(result)
@@ -48,7 +107,7 @@ def analyze_cattle_image(image_path):
         }
         
     except Exception as e:
-        logger.error(f"Error analyzing image: {str(e)}")
+        logger.exception("Error analyzing image")
         return {
             'success': False,
             'status': 'failed',
@@ -85,23 +144,15 @@ def parse_roboflow_result(result):
         confidence = highest_confidence_pred.get('confidence', 0.0) * 100  # Convert to percentage
         
         # Map detected class to our result categories
-        if 'fmd' in detected_class or 'foot-and-mouth' in detected_class or 'disease' in detected_class:
-            result_category = 'fmd'
-        elif 'healthy' in detected_class or 'normal' in detected_class:
-            result_category = 'healthy'
-        elif 'cow' in detected_class or 'cattle' in detected_class:
-            # If it's just labeled as cow without health status, mark as inconclusive
-            result_category = 'inconclusive'
-        else:
-            result_category = 'not_cow'
+        result_category = categorize_class(detected_class)
         
         return {
             'result': result_category,
             'confidence': round(confidence, 2)
         }
         
-    except Exception as e:
-        logger.error(f"Error parsing Roboflow result: {str(e)}")
+    except Exception:
+        logger.exception("Error parsing Roboflow result")
         return {
             'result': 'inconclusive',
             'confidence': 0.0
@@ -124,6 +175,7 @@ def get_detection_summary(predictions):
         'fmd_count': 0,
         'detections': []
     }
+    category_counts = {'fmd': 'fmd_count', 'healthy': 'healthy_count'}
     
     for pred in predictions:
         detected_class = pred.get('class', '').lower()
@@ -143,13 +195,18 @@ def get_detection_summary(predictions):
         summary['detections'].append(detection_info)
         
         # Count by category
-        if 'fmd' in detected_class or 'disease' in detected_class:
-            summary['fmd_count'] += 1
-            summary['total_cows'] += 1
-        elif 'healthy' in detected_class:
-            summary['healthy_count'] += 1
-            summary['total_cows'] += 1
-        elif 'cow' in detected_class or 'cattle' in detected_class:
+        category = categorize_class(detected_class)
+        if category != 'not_cow':
             summary['total_cows'] += 1
+            if category in category_counts:
+                summary[category_counts[category]] += 1
     
-    return summary
\ No newline at end of file
+    return summary
+
+
+def categorize_class(detected_class):
+    """Map a lower-cased Roboflow class name to a result category"""
+    for keyword, category in _CATEGORY_KEYWORDS:
+        if keyword in detected_class:
+            return category
+    return 'not_cow'
@@ -0,0 +1,14 @@
+"""
+Signal handlers for FMD Detection System
+"""
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import Detection, UserDailyStats
+
+
+@receiver(post_delete, sender=Detection)
+def detection_deleted(sender, instance, **kwargs):
+    """Keep the dashboard's monthly count in step with the all-time total"""
+    UserDailyStats.decrement(instance.user_id, timezone.localdate(instance.uploaded_at))
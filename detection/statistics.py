@@ -0,0 +1,28 @@
+"""
+Statistics aggregation helpers for FMD Detection System
+"""
+from django.db.models import Sum
+
+from .models import SystemStatistics
+
+
+class StatisticsAggregator:
+    """Sum daily SystemStatistics rows over a date range"""
+
+    def __init__(self, start_date, end_date):
+        self.start_date = start_date
+        self.end_date = end_date
+
+    def get_totals(self):
+        """Return period totals computed by the database in one query"""
+        totals = SystemStatistics.objects.filter(
+            date__range=[self.start_date, self.end_date]
+        ).aggregate(
+            total=Sum('total_scans'),
+            fmd=Sum('fmd_detected'),
+            healthy=Sum('healthy_cattle'),
+            not_cow=Sum('not_cow_detected'),
+        )
+
+        # Sum() returns None when no rows fall in the range
+        return {key: value or 0 for key, value in totals.items()}
@@ -0,0 +1,160 @@
+"""
+Background tasks for FMD Detection System
+"""
+from celery import shared_task
+from django.contrib.auth.models import User
+from django.core.mail import EmailMessage, EmailMultiAlternatives
+from django.db import transaction
+from django.utils import timezone
+from kombu.exceptions import OperationalError
+from smtplib import SMTPException
+import logging
+
+from .models import Detection, SystemStatistics
+from .reports import ReportGenerator, persist_report
+from .services import analyze_cattle_image
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def run_detection(detection_id):
+    """Analyze an uploaded image with Roboflow and store the result"""
+    try:
+        detection = Detection.objects.get(id=detection_id)
+    except Detection.DoesNotExist:
+        logger.warning("Detection %s no longer exists, skipping analysis", detection_id)
+        return
+    
+    # A redelivered task after the result was stored has nothing to do
+    if detection.status != 'analyzing':
+        logger.info("Detection %s is already %s, skipping analysis", detection_id, detection.status)
+        return
+    
+    update_fields = ['status']
+    
+    # The upload request only stores the original; the preview is built here
+    detection.generate_thumbnail()
+    detection.image.close()
+    if detection.thumbnail:
+        update_fields.append('thumbnail')
+    
+    try:
+        analysis_result = analyze_cattle_image(detection.image.path)
+        
+        if analysis_result['success']:
+            detection.status = 'completed'
+            detection.result = analysis_result['result']
+            detection.confidence_score = analysis_result['confidence_score']
+            detection.analyzed_at = timezone.now()
+            update_fields += ['result', 'confidence_score', 'analyzed_at']
+        else:
+            logger.error(
+                "Analysis failed for detection %s: %s",
+                detection_id, analysis_result.get('error', 'Unknown error')
+            )
+            detection.status = 'failed'
+    
+    except Exception:
+        logger.exception("Error during analysis of detection %s", detection_id)
+        detection.status = 'failed'
+    
+    # Lock the row only for the final write, not across the Roboflow call.
+    # A concurrent duplicate either skips the locked row or finds it settled,
+    # so statistics are counted exactly once.
+    with transaction.atomic():
+        claimed = Detection.objects.select_for_update(skip_locked=True).filter(
+            id=detection_id, status='analyzing'
+        ).only('id').first()
+        if claimed is None:
+            logger.info("Detection %s was finalised by another worker", detection_id)
+            return
+        
+        # Write the final state in one UPDATE whatever the outcome
+        detection.save(update_fields=update_fields)
+        
+        if detection.status == 'completed':
+            update_statistics(detection)
+
+
+def queue_detection(detection_id):
+    """Queue analysis for a detection, failing it if the broker can't be reached"""
+    try:
+        run_detection.delay(detection_id)
+    except OperationalError:
+        # Nothing would ever pick the row up, so don't leave it 'analyzing'
+        logger.exception("Could not queue analysis for detection %s", detection_id)
+        Detection.objects.filter(id=detection_id, status='analyzing').update(status='failed')
+
+
+@shared_task(bind=True, acks_late=True, max_retries=3)
+def generate_and_email_report(self, user_id, report_type):
+    """Build a user's PDF report, email it to them and record it"""
+    try:
+        user = User.objects.get(id=user_id)
+    except User.DoesNotExist:
+        logger.warning("User %s no longer exists, skipping %s report", user_id, report_type)
+        return
+    
+    generator = ReportGenerator(user, report_type)
+    buffer, start_date, end_date, title, data = generator.render()
+    
+    message = f"""
+    Dear {user.get_full_name()},
+    
+    Please find attached your {report_type} FMD detection report.
+    
+    Summary:
+    - Total Scans: {data['total_scans']}
+    - FMD Detected: {data['fmd_detected']}
+    - Healthy Cattle: {data['healthy_cattle']}
+    
+    Best regards,
+    FMD Detection System
+    Simba Farms
+    """
+    
+    email = EmailMessage(
+        subject=f'FMD Detection System - {title}',
+        body=message,
+        from_email='noreply@simbafarmsdetection.com',
+        to=[user.email],
+    )
+    filename = f'FMD_{report_type}_report_{timezone.now().strftime("%Y%m%d")}.pdf'
+    email.attach(filename, buffer.getvalue(), 'application/pdf')
+    
+    try:
+        email.send()
+    except (SMTPException, OSError) as exc:
+        # Mail server hiccups are usually transient
+        raise self.retry(exc=exc, countdown=60)
+    
+    persist_report(user, report_type, start_date, end_date, data)
+
+
+@shared_task(bind=True, acks_late=True, max_retries=3)
+def send_email(self, subject, body, from_email, to, html_body=None):
+    """Send a pre-rendered email off the request cycle"""
+    email = EmailMultiAlternatives(subject, body, from_email, to)
+    if html_body:
+        email.attach_alternative(html_body, 'text/html')
+    
+    try:
+        email.send()
+    except (SMTPException, OSError) as exc:
+        raise self.retry(exc=exc, countdown=60)
+
+
+def update_statistics(detection):
+    """Update system statistics after detection"""
+    today = timezone.now().date()
+    deltas = {'total_scans': 1}
+    
+    if detection.result == 'fmd':
+        deltas['fmd_detected'] = 1
+    elif detection.result == 'healthy':
+        deltas['healthy_cattle'] = 1
+    elif detection.result == 'not_cow':
+        deltas['not_cow_detected'] = 1
+    
+    SystemStatistics.increment(today, **deltas)
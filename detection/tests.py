@@ -1,3 +1,186 @@
-from django.test import TestCase
+import shutil
+import tempfile
+from io import BytesIO, StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from kombu.exceptions import OperationalError
+from PIL import Image
+
+from .models import Detection, UserDailyStats, UserProfile
+from .reports import ReportGenerator
+
+
+# Templates render without a collectstatic manifest
+plain_static_storage = override_settings(STORAGES={
+    **settings.STORAGES,
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+})
+
+
+@plain_static_storage
+class QueryCountTests(TestCase):
+    """Guard the aggregate-query pages against N+1 regressions"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('farmer', 'farmer@example.com', 'testpass123')
+        UserProfile.objects.create(user=cls.user)
+
+    def setUp(self):
+        # The dashboard caches its recent detections fragment
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def create_detections(self, count):
+        Detection.objects.bulk_create([
+            Detection(
+                user=self.user,
+                image='cattle_images/test.jpg',
+                status='completed',
+                result='fmd' if i % 2 else 'healthy',
+                confidence_score=0.9,
+            )
+            for i in range(count)
+        ])
+
+    def test_dashboard_query_count(self):
+        self.create_detections(3)
+        # Session, user, counters aggregate, monthly total and recent detections
+        with self.assertNumQueries(5):
+            response = self.client.get(reverse('dashboard'))
+        self.assertEqual(response.status_code, 200)
+
+    def test_dashboard_query_count_does_not_grow_with_detections(self):
+        self.create_detections(30)
+        with self.assertNumQueries(5):
+            self.client.get(reverse('dashboard'))
+
+    def test_history_query_count(self):
+        self.create_detections(3)
+        # Session, user, paginator count and one page of detections
+        with self.assertNumQueries(4):
+            response = self.client.get(reverse('history'))
+        self.assertEqual(response.status_code, 200)
+
+    def test_history_query_count_does_not_grow_with_detections(self):
+        self.create_detections(30)
+        with self.assertNumQueries(4):
+            self.client.get(reverse('history'))
+
+
+class ReportGeneratorTests(TestCase):
+    """Reports must always reflect the data at the time they are requested"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('farmer', 'farmer@example.com', 'testpass123')
+
+    def test_new_detection_appears_in_next_report(self):
+        pdf, _, _, _, data = ReportGenerator(self.user, 'daily').render()
+        self.assertEqual(data['total_scans'], 0)
+
+        Detection.objects.create(
+            user=self.user, image='cattle_images/test.jpg', status='completed', result='fmd',
+        )
+
+        new_pdf, _, _, _, data = ReportGenerator(self.user, 'daily').render()
+        self.assertEqual(data['total_scans'], 1)
+        self.assertEqual(data['fmd_detected'], 1)
+        self.assertNotEqual(new_pdf.getvalue(), pdf.getvalue())
+
+    def test_render_builds_pdf_from_returned_figures(self):
+        Detection.objects.create(
+            user=self.user, image='cattle_images/test.jpg', status='completed', result='healthy',
+        )
+        # One aggregate shared by the PDF and the caller, the profile and the detail rows
+        with self.assertNumQueries(3):
+            _, _, _, _, data = ReportGenerator(self.user, 'weekly').render()
+        self.assertEqual(data['healthy_cattle'], 1)
+
+
+class UserDailyStatsTests(TestCase):
+    """The monthly counter must never run ahead of the live detection count"""
+
+    def setUp(self):
+        self.user = User.objects.create_user('farmer', 'farmer@example.com', 'testpass123')
+        self.detection = Detection.objects.create(user=self.user, image='cattle_images/test.jpg')
+        UserDailyStats.increment(self.user.id, timezone.localdate(self.detection.uploaded_at), total_scans=1)
+
+    def test_deleting_detection_decrements_daily_count(self):
+        self.detection.delete()
+        self.assertEqual(UserDailyStats.objects.get(user=self.user).total_scans, 0)
+
+    def test_deleting_user_removes_counters(self):
+        self.user.delete()
+        self.assertFalse(UserDailyStats.objects.exists())
+
+
+class ThumbnailBackfillTests(TestCase):
+    """generate_thumbnails must skip detections whose media file is gone"""
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        override = override_settings(MEDIA_ROOT=media_root)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.user = User.objects.create_user('farmer', 'farmer@example.com', 'testpass123')
+
+    def test_backfill_skips_missing_files(self):
+        buffer = BytesIO()
+        Image.new('RGB', (800, 600), 'red').save(buffer, 'PNG')
+        present = Detection(user=self.user)
+        present.image.save('present.png', ContentFile(buffer.getvalue()))
+        missing = Detection.objects.create(user=self.user, image='cattle_images/missing.png')
+
+        out = StringIO()
+        call_command('generate_thumbnails', stdout=out)
+
+        self.assertIn('Generated 1 thumbnail(s)', out.getvalue())
+        present.refresh_from_db()
+        missing.refresh_from_db()
+        self.assertTrue(present.thumbnail)
+        self.assertFalse(missing.thumbnail)
+
+
+@plain_static_storage
+class BrokerOutageTests(TestCase):
+    """A failed enqueue must not leave rows stuck or surface as a 500"""
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        override = override_settings(MEDIA_ROOT=media_root)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.user = User.objects.create_user('farmer', 'farmer@example.com', 'testpass123')
+        self.client.force_login(self.user)
+
+    @mock.patch('detection.tasks.run_detection.delay', side_effect=OperationalError('broker down'))
+    def test_upload_marks_detection_failed(self, delay):
+        buffer = BytesIO()
+        Image.new('RGB', (64, 64), 'red').save(buffer, 'JPEG')
+        image = SimpleUploadedFile('cow.jpg', buffer.getvalue(), content_type='image/jpeg')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('upload_image'), {'image': image, 'upload_method': 'file'})
+
+        self.assertEqual(response.status_code, 302)
+        delay.assert_called_once()
+        self.assertEqual(Detection.objects.get(user=self.user).status, 'failed')
+
+    @mock.patch('detection.views.generate_and_email_report.delay', side_effect=OperationalError('broker down'))
+    def test_email_report_shows_error(self, delay):
+        response = self.client.post(reverse('email_report', args=['daily']), follow=True)
+
+        self.assertRedirects(response, reverse('reports'))
+        self.assertIn('Error sending report', [str(m) for m in response.context['messages']][0])
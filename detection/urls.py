@@ -4,6 +4,7 @@ URL Configuration for detection app
 from django.urls import path
 from django.contrib.auth import views as auth_views
 from . import views
+from .forms import QueuedPasswordResetForm
 
 urlpatterns = [
     # Authentication URLs
@@ -16,6 +17,7 @@ urlpatterns = [
     path('password-reset/', 
          auth_views.PasswordResetView.as_view(
              template_name='auth/password_reset.html',
+             form_class=QueuedPasswordResetForm,
              email_template_name='auth/password_reset_email.html',
              subject_template_name='auth/password_reset_subject.txt',
              success_url='/password-reset/done/'
@@ -44,10 +46,6 @@ urlpatterns = [
     # Dashboard URLs
     path('dashboard/', views.dashboard_view, name='dashboard'),
     
-    
-    # Dashboard URLs
-    path('dashboard/', views.dashboard_view, name='dashboard'),
-    
     # Detection URLs
     path('upload/', views.upload_image_view, name='upload_image'),
     path('history/', views.history_view, name='history'),
@@ -1,18 +1,32 @@
 from django.shortcuts import render, redirect, get_object_or_404
+from django.conf import settings
 from django.contrib.auth import login, logout, authenticate
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.db.models import Count, Q
+from django.core.files import File
+from django.core.mail import send_mail
+from django.core.paginator import Paginator
+from django.db import transaction
+from django.db.models import Count, Max, Q, Sum
+from django.http import HttpResponse, JsonResponse
 from django.utils import timezone
-from datetime import timedelta
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import require_http_methods, require_POST, require_safe
+from django.views.decorators.vary import vary_on_cookie
+from kombu.exceptions import OperationalError
+from tempfile import SpooledTemporaryFile
+from urllib.parse import urlencode
+import base64
 from .forms import UserRegistrationForm, UserLoginForm, DetectionUploadForm
-from .models import Detection, SystemStatistics, UserProfile, Report
-from .services import analyze_cattle_image
+from .models import Detection, UserDailyStats, Report
+from .reports import ReportGenerator, persist_report
+from .tasks import generate_and_email_report, queue_detection
 
 # ========================================
 # AUTHENTICATION VIEWS
 # ========================================
 
+@require_http_methods(["GET", "POST"])
 def register_view(request):
     """Handle user registration"""
     if request.user.is_authenticated:
@@ -40,6 +54,7 @@ def register_view(request):
     return render(request, 'auth/register.html', context)
 
 
+@require_http_methods(["GET", "POST"])
 def login_view(request):
     """Handle user login"""
     if request.user.is_authenticated:
@@ -84,31 +99,47 @@ def logout_view(request):
 # DASHBOARD VIEWS
 # ========================================
 
+@require_safe
 @login_required
 def dashboard_view(request):
     """Display main dashboard with statistics"""
     user_detections = Detection.objects.filter(user=request.user)
     
-    total_scans = user_detections.count()
-    fmd_detected = user_detections.filter(result='fmd').count()
-    healthy_cattle = user_detections.filter(result='healthy').count()
+    # All dashboard counters in a single query, keyed by their template names
+    stats = user_detections.aggregate(
+        total_scans=Count('id'),
+        fmd_detected=Count('id', filter=Q(result='fmd')),
+        healthy_cattle=Count('id', filter=Q(result='healthy')),
+        # Change markers for the cached recent detections fragment
+        latest_upload=Max('uploaded_at'),
+        latest_analysis=Max('analyzed_at'),
+        in_progress=Count('id', filter=Q(status__in=['pending', 'analyzing'])),
+    )
+    recent_version = '{total_scans}:{latest_upload}:{latest_analysis}:{in_progress}'.format(**stats)
+    for marker in ('latest_upload', 'latest_analysis', 'in_progress'):
+        del stats[marker]
     
-    recent_detections = user_detections.select_related('user')[:5]
+    # Sum at most one pre-aggregated row per day instead of counting the month's detections
+    stats['this_month_scans'] = UserDailyStats.objects.filter(
+        user=request.user, date__gte=timezone.localdate().replace(day=1)
+    ).aggregate(total=Sum('total_scans'))['total'] or 0
     
-    first_day = timezone.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-    this_month_scans = user_detections.filter(uploaded_at__gte=first_day).count()
+    # The owner is request.user, so only fetch the columns the table renders.
+    # Lazy, so a cached fragment never runs the query.
+    recent_detections = user_detections.only(
+        'id', 'uploaded_at', 'status', 'result', 'confidence_score'
+    )[:5]
     
     context = {
         'title': 'Dashboard - FMD Detection System',
-        'total_scans': total_scans,
-        'fmd_detected': fmd_detected,
-        'healthy_cattle': healthy_cattle,
         'recent_detections': recent_detections,
-        'this_month_scans': this_month_scans,
+        'recent_version': recent_version,
+        **stats,
     }
     return render(request, 'dashboard/dashboard.html', context)
 
 
+@require_http_methods(["GET", "POST"])
 @login_required
 def upload_image_view(request):
     """Handle cattle image upload and analysis"""
@@ -118,16 +149,20 @@ def upload_image_view(request):
         
         if captured_image_data:
             # Handle captured image from camera
-            import base64
-            from django.core.files.base import ContentFile
-            from django.utils import timezone
-            
             # Remove data URL prefix
             format, imgstr = captured_image_data.split(';base64,')
             ext = format.split('/')[-1]
             
+            # Decode in slices (a multiple of 4 characters) into a spooled file,
+            # so large captures spill to disk instead of being copied in memory
+            image_file = SpooledTemporaryFile(max_size=1024 * 1024)
+            chunk_size = 64 * 1024
+            for start in range(0, len(imgstr), chunk_size):
+                image_file.write(base64.b64decode(imgstr[start:start + chunk_size]))
+            image_file.seek(0)
+            
             # Create file from base64 data
-            image_data = ContentFile(base64.b64decode(imgstr), name=f'captured_{timezone.now().strftime("%Y%m%d_%H%M%S")}.{ext}')
+            image_data = File(image_file, name=f'captured_{timezone.now().strftime("%Y%m%d_%H%M%S")}.{ext}')
             
             # Create detection record
             detection = Detection(
@@ -152,54 +187,14 @@ def upload_image_view(request):
             detection.status = 'analyzing'
             detection.save()
         
-        try:
-            # Get the absolute path to the uploaded image
-            image_path = detection.image.path
-            
-            # Analyze the image using Roboflow
-            analysis_result = analyze_cattle_image(image_path)
-            
-            if analysis_result['success']:
-                # Update detection with results
-                detection.status = 'completed'  # Explicitly set to completed
-                detection.result = analysis_result['result']
-                detection.confidence_score = analysis_result['confidence_score']
-                detection.analyzed_at = timezone.now()
-                detection.save()
-                
-                # Update system statistics
-                update_statistics(detection)
-                
-                # Show success message with result
-                if detection.result == 'fmd':
-                    messages.warning(
-                        request, 
-                        f'⚠️ FMD Detected with {detection.confidence_score:.1f}% confidence! Please isolate the animal immediately.'
-                    )
-                elif detection.result == 'healthy':
-                    messages.success(
-                        request, 
-                        f'✅ Animal appears healthy ({detection.confidence_score:.1f}% confidence).'
-                    )
-                else:
-                    messages.info(
-                        request, 
-                        f'Analysis complete. Result: {detection.get_result_display()}'
-                    )
-            else:
-                # Analysis failed
-                detection.status = 'failed'
-                detection.save()
-                messages.error(
-                    request, 
-                    f'Analysis failed: {analysis_result.get("error", "Unknown error")}'
-                )
-            
-        except Exception as e:
-            detection.status = 'failed'
-            detection.save()
-            messages.error(request, f'Error during analysis: {str(e)}')
+        # Count the scan towards the user's monthly total as soon as it arrives
+        UserDailyStats.increment(request.user.id, timezone.localdate(), total_scans=1)
+        
+        # Analyze in the background so the worker is free while Roboflow responds
+        detection_id = str(detection.id)
+        transaction.on_commit(lambda: queue_detection(detection_id))
         
+        messages.info(request, 'Image uploaded. Analysis is running, results will appear here shortly.')
         return redirect('detection_detail', detection_id=detection.id)
     else:
         form = DetectionUploadForm()
@@ -211,27 +206,15 @@ def upload_image_view(request):
     return render(request, 'dashboard/upload.html', context)
 
 
-def update_statistics(detection):
-    """Update system statistics after detection"""
-    today = timezone.now().date()
-    stats, created = SystemStatistics.objects.get_or_create(date=today)
-    
-    stats.total_scans += 1
-    
-    if detection.result == 'fmd':
-        stats.fmd_detected += 1
-    elif detection.result == 'healthy':
-        stats.healthy_cattle += 1
-    elif detection.result == 'not_cow':
-        stats.not_cow_detected += 1
-    
-    stats.save()
-
-
+@require_safe
 @login_required
+@cache_control(private=True, no_cache=True)
+@vary_on_cookie
 def history_view(request):
     """Display detection history"""
-    detections = Detection.objects.filter(user=request.user).select_related('user')
+    detections = Detection.objects.filter(user=request.user).only(
+        'id', 'image', 'thumbnail', 'uploaded_at', 'status', 'result', 'confidence_score'
+    ).order_by('-uploaded_at')
     
     status_filter = request.GET.get('status')
     if status_filter:
@@ -241,15 +224,26 @@ def history_view(request):
     if result_filter:
         detections = detections.filter(result=result_filter)
     
+    # Bound the rows fetched and rendered per request
+    paginator = Paginator(detections, 25)
+    page_obj = paginator.get_page(request.GET.get('page'))
+    
+    # Keep the active filters on the page links
+    filter_query = urlencode({
+        key: value for key, value in (('status', status_filter), ('result', result_filter)) if value
+    })
+    
     context = {
         'title': 'Detection History',
-        'detections': detections,
+        'page_obj': page_obj,
+        'filter_query': filter_query,
         'status_filter': status_filter,
         'result_filter': result_filter,
     }
     return render(request, 'dashboard/history.html', context)
 
 
+@require_safe
 @login_required
 def detection_detail_view(request, detection_id):
     """Display details of a specific detection"""
@@ -262,6 +256,7 @@ def detection_detail_view(request, detection_id):
     return render(request, 'dashboard/detection_detail.html', context)
 
 
+@require_safe
 @login_required
 def help_view(request):
     """Display help and support information"""
@@ -275,11 +270,17 @@ def help_view(request):
 # REPORT GENERATION VIEWS
 # ========================================
 
+@require_safe
 @login_required
+@cache_control(private=True, no_cache=True)
+@vary_on_cookie
 def reports_view(request):
     """Display reports dashboard"""
     # Get user's generated reports
-    user_reports = Report.objects.filter(user=request.user)[:10]
+    user_reports = Report.objects.filter(user=request.user).only(
+        'id', 'report_type', 'start_date', 'end_date',
+        'total_scans', 'fmd_detected', 'healthy_cattle', 'generated_at'
+    ).order_by('-generated_at')[:10]
     
     context = {
         'title': 'Reports',
@@ -288,13 +289,10 @@ def reports_view(request):
     return render(request, 'dashboard/reports.html', context)
 
 
+@require_POST
 @login_required
 def generate_report_view(request, report_type):
     """Generate and download a PDF report"""
-    from django.http import HttpResponse
-    from .reports import ReportGenerator
-    from .models import Report
-    
     # Validate report type
     if report_type not in ['daily', 'weekly', 'monthly']:
         messages.error(request, 'Invalid report type.')
@@ -303,25 +301,15 @@ def generate_report_view(request, report_type):
     try:
         # Generate the report
         generator = ReportGenerator(request.user, report_type)
-        pdf = generator.generate()
         
-        # Get date range for report record
-        start_date, end_date, title = generator.get_date_range()
-        data = generator.get_report_data(start_date, end_date)
+        # ReportLab writes straight into the response body
+        response = HttpResponse(content_type='application/pdf')
+        _, start_date, end_date, title, data = generator.render(response)
         
         # Save report record
-        Report.objects.create(
-            user=request.user,
-            report_type=report_type,
-            start_date=start_date,
-            end_date=end_date,
-            total_scans=data['total_scans'],
-            fmd_detected=data['fmd_detected'],
-            healthy_cattle=data['healthy_cattle']
-        )
+        persist_report(request.user, report_type, start_date, end_date, data)
         
-        # Create HTTP response with PDF
-        response = HttpResponse(pdf, content_type='application/pdf')
+        # Attach the PDF as a download
         filename = f'FMD_{report_type}_report_{timezone.now().strftime("%Y%m%d_%H%M%S")}.pdf'
         response['Content-Disposition'] = f'attachment; filename="{filename}"'
         
@@ -333,81 +321,28 @@ def generate_report_view(request, report_type):
         return redirect('reports')
 
 
+@require_POST
 @login_required
 def email_report_view(request, report_type):
-    """Generate and email a PDF report"""
-    from django.core.mail import EmailMessage
-    from .reports import ReportGenerator
-    from .models import Report
-    
+    """Queue a PDF report to be generated and emailed"""
     # Validate report type
     if report_type not in ['daily', 'weekly', 'monthly']:
         messages.error(request, 'Invalid report type.')
         return redirect('reports')
     
+    # PDF generation and SMTP both run on a worker; the request only queues the job
     try:
-        # Generate the report
-        generator = ReportGenerator(request.user, report_type)
-        pdf = generator.generate()
-        
-        # Get date range
-        start_date, end_date, title = generator.get_date_range()
-        data = generator.get_report_data(start_date, end_date)
-        
-        # Save report record
-        Report.objects.create(
-            user=request.user,
-            report_type=report_type,
-            start_date=start_date,
-            end_date=end_date,
-            total_scans=data['total_scans'],
-            fmd_detected=data['fmd_detected'],
-            healthy_cattle=data['healthy_cattle']
-        )
-        
-        # Send email
-        subject = f'FMD Detection System - {title}'
-        message = f"""
-        Dear {request.user.get_full_name()},
-        
-        Please find attached your {report_type} FMD detection report.
-        
-        Summary:
-        - Total Scans: {data['total_scans']}
-        - FMD Detected: {data['fmd_detected']}
-        - Healthy Cattle: {data['healthy_cattle']}
-        
-        Best regards,
-        FMD Detection System
-        Simba Farms
-        """
-        
-        email = EmailMessage(
-            subject=subject,
-            body=message,
-            from_email='noreply@simbafarmsdetection.com',
-            to=[request.user.email],
-        )
-        
-        filename = f'FMD_{report_type}_report_{timezone.now().strftime("%Y%m%d")}.pdf'
-        email.attach(filename, pdf, 'application/pdf')
-        email.send()
-        
-        messages.success(request, f'Report has been sent to {request.user.email}!')
-        return redirect('reports')
-        
-    except Exception as e:
+        generate_and_email_report.delay(request.user.id, report_type)
+    except OperationalError as e:
         messages.error(request, f'Error sending report: {str(e)}')
         return redirect('reports')
     
+    messages.success(request, f'Your {report_type} report is being prepared and will be sent to {request.user.email} shortly.')
+    return redirect('reports')
 
 
-#password-reset
-from django.http import JsonResponse
-from django.core.mail import send_mail
-from django.conf import settings
-import os
 
+#password-reset
 @login_required
 def test_email_config(request):
     """Test email configuration"""
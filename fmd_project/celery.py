@@ -0,0 +1,14 @@
+"""
+Celery application for fmd_project
+"""
+import os
+
+from celery import Celery
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'fmd_project.settings')
+
+app = Celery('fmd_project')
+
+# Read CELERY_* options from Django settings
+app.config_from_object('django.conf:settings', namespace='CELERY')
+app.autodiscover_tasks()
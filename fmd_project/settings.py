@@ -4,6 +4,7 @@ Development & Production (Render) Ready
 """
 
 import os
+from importlib.util import find_spec
 from pathlib import Path
 import dj_database_url
 
@@ -68,14 +69,28 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',  # Static files on Render
+    'django.middleware.gzip.GZipMiddleware',  # Compress rendered pages
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
+    'django.middleware.http.ConditionalGetMiddleware',  # ETag / 304 responses
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# --------------------------------------------------
+# PROFILING (DEVELOPMENT ONLY)
+# --------------------------------------------------
+# django-silk records per-request SQL counts and timings under /silk/ when
+# installed locally; it is never enabled in production
+SILK_ENABLED = DEBUG and find_spec('silk') is not None
+if SILK_ENABLED:
+    INSTALLED_APPS += ['silk']
+    # Must follow GZip, otherwise silk records compressed response bodies
+    MIDDLEWARE.insert(MIDDLEWARE.index('django.middleware.gzip.GZipMiddleware') + 1, 'silk.middleware.SilkyMiddleware')
+    SILKY_PYTHON_PROFILER = True
+
 # --------------------------------------------------
 # URLS / WSGI
 # --------------------------------------------------
@@ -104,6 +119,9 @@ TEMPLATES = [
 # --------------------------------------------------
 # DATABASE
 # --------------------------------------------------
+# Connections persist for 10 minutes per worker thread. Django's built-in
+# pool (OPTIONS['pool']) needs Django 5.1+ and cannot be combined with
+# CONN_MAX_AGE, so persistent connections are used here.
 if os.environ.get('DATABASE_URL'):
     DATABASES = {
         'default': dj_database_url.config(
@@ -116,9 +134,41 @@ else:
         'default': {
             'ENGINE': 'django.db.backends.sqlite3',
             'NAME': BASE_DIR / 'db.sqlite3',
+            'CONN_MAX_AGE': 600,
         }
     }
 
+# --------------------------------------------------
+# CACHES
+# --------------------------------------------------
+CACHES = {
+    # Shared across gunicorn workers when Redis is available
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ['REDIS_URL'],
+    } if os.environ.get('REDIS_URL') else {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+}
+
+# --------------------------------------------------
+# CELERY (BACKGROUND IMAGE ANALYSIS)
+# --------------------------------------------------
+# Only an explicit broker queues tasks; REDIS_URL alone just enables the
+# shared cache, so a deploy without worker processes keeps analysing inline
+CELERY_BROKER_URL = os.environ.get('CELERY_BROKER_URL', '')
+# Without a broker (local development) tasks run inline in the web process
+CELERY_TASK_ALWAYS_EAGER = not CELERY_BROKER_URL
+CELERY_TASK_IGNORE_RESULT = True
+CELERY_TASK_ACKS_LATE = True
+CELERY_WORKER_PREFETCH_MULTIPLIER = 1
+# Image analysis and slow PDF/SMTP jobs get their own queues so one
+# cannot starve the other
+CELERY_TASK_ROUTES = {
+    'detection.tasks.run_detection': {'queue': 'classification'},
+    'detection.tasks.generate_and_email_report': {'queue': 'reports'},
+}
+
 # --------------------------------------------------
 # PASSWORD VALIDATION
 # --------------------------------------------------
@@ -149,6 +199,7 @@ STORAGES = {
         "BACKEND": "django.core.files.storage.FileSystemStorage",
     },
     "staticfiles": {
+        # Writes .br alongside .gz variants when the Brotli package is installed
         "BACKEND": "whitenoise.storage.CompressedManifestStaticFilesStorage",
     },
 }
@@ -166,9 +217,10 @@ LOGIN_URL = 'login'
 LOGIN_REDIRECT_URL = 'dashboard'
 LOGOUT_REDIRECT_URL = 'login'
 
+# EmailOrUsernameBackend subclasses ModelBackend and already matches
+# usernames, so listing ModelBackend too only repeats failed lookups
 AUTHENTICATION_BACKENDS = [
     'detection.backends.EmailOrUsernameBackend',
-    'django.contrib.auth.backends.ModelBackend',
 ]
 
 # --------------------------------------------------
@@ -182,10 +234,13 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # if DEBUG:
 #     EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 # else:
-EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+# Outgoing mail is sent from Celery tasks, so the SMTP handshake never blocks a request
+EMAIL_BACKEND = os.environ.get('EMAIL_BACKEND', 'django.core.mail.backends.smtp.EmailBackend')
 EMAIL_HOST = 'smtp.gmail.com'
 EMAIL_PORT = 587
 EMAIL_USE_TLS = True
+# Fail fast so a stalled mail server triggers a task retry instead of pinning a worker
+EMAIL_TIMEOUT = 10
 EMAIL_HOST_USER = os.environ.get('EMAIL_HOST_USER', 'atwebembereboniface@gmail.com')
 EMAIL_HOST_PASSWORD = os.environ.get('EMAIL_HOST_PASSWORD','nkcqkiccyxmtlbgk')
 DEFAULT_FROM_EMAIL = 'FMD Detection System <atwebembereboniface@gmail.com>'
@@ -16,6 +16,10 @@ if settings.DEBUG:
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
     urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
 
+# Request profiling in development
+if settings.SILK_ENABLED:
+    urlpatterns += [path('silk/', include('silk.urls', namespace='silk'))]
+
 # Customize admin site
 admin.site.site_header = "FMD Detection System Admin"
 admin.site.site_title = "FMD Admin Portal"